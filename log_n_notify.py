@@ -3,56 +3,121 @@
 Option trades logging with comprehensive option data
 """
 
+import asyncio
+import atexit
 import csv
 import datetime
+import functools
+import time
+from collections import Counter
 from pathlib import Path
+from typing import Any, TextIO
 
-import pandas as pd
-from ib_async import IB, Option
+from ib_async import IB, Option, Stock
 
 import telegram_bot as tg
 
 # Global configuration
 SEND_TELEGRAM_NOTIFICATIONS = True
 
+# Payoff sign per option right - lets intrinsic value be one branchless formula
+_RIGHT_SIGN = {"C": 1.0, "P": -1.0}
+
+
+def parse_yyyymmdd(s: str) -> datetime.date:
+    """Parse an IB YYYYMMDD expiry ~10x faster than strptime"""
+    return datetime.date(int(s[0:4]), int(s[4:6]), int(s[6:8]))
+
+
+# Fixed column layout shared by the header writer and the row builder
+CSV_COLUMNS = (
+    "timestamp",
+    "action",
+    "option_type",
+    "ticker",
+    "strike",
+    "expiry",
+    "right",
+    "price",
+    "quantity",
+    "delta",
+    "gamma",
+    "theta",
+    "vega",
+    "implied_volatility",
+    "time_to_expiry_days",
+    "underlying_price",
+    "intrinsic_value",
+    "time_value",
+    "pnl",
+    "cumulative_pnl",
+    "commission",
+    "contract_symbol",
+    "notes",
+)
+
+
+@functools.lru_cache(maxsize=32)
+def _trades_path(ticker: str) -> Path:
+    """Memoized Path to a ticker's trades CSV - built once, not per call"""
+    return Path(f"output/option_trades_{ticker}.csv")
+
+
+# Qualified Stock contracts, keyed by ticker, so each underlying is only
+# qualified against IB once per process
+_stocks: dict[str, Stock] = {}
+
+# Recent underlying prices as (price, monotonic timestamp) - back-to-back
+# log calls (e.g. rolling a short call) reuse the price instead of
+# re-requesting market data
+_px_cache: dict[str, tuple[float, float]] = {}
+PX_CACHE_TTL = 0.5
+
+# Open append handles per ticker - opening the CSV once per process
+# amortizes the open/close syscalls across all logged trades
+_writers: dict[str, tuple[TextIO, Any]] = {}
+
+
+def _trade_writer(ticker: str) -> tuple[TextIO, Any]:
+    """Get (or open once) the line-buffered append handle for a ticker"""
+    entry = _writers.get(ticker)
+    if entry is None:
+        trades_file = _trades_path(ticker)
+        fh = trades_file.open("a", newline="", buffering=1)
+        atexit.register(fh.close)
+        entry = (fh, csv.writer(fh))
+        _writers[ticker] = entry
+    return entry
+
+
+async def _underlying_price(ib: IB, ticker: str) -> float:
+    """Get underlying price, qualifying the Stock once and caching briefly"""
+    cached = _px_cache.get(ticker)
+    if cached and time.monotonic() - cached[1] < PX_CACHE_TTL:
+        return cached[0]
+
+    stock = _stocks.get(ticker)
+    if stock is None:
+        stock = Stock(ticker, "SMART", "USD")
+        await ib.qualifyContractsAsync(stock)
+        _stocks[ticker] = stock
+
+    tickers = await ib.reqTickersAsync(stock)
+    price = tickers[0].marketPrice() if tickers else 0.0
+    _px_cache[ticker] = (price, time.monotonic())
+    return price
+
 
 def init_option_trades_csv(ticker: str):
     """Initialize option trades CSV with comprehensive columns"""
-    trades_file = Path(f"output/option_trades_{ticker}.csv")
+    trades_file = _trades_path(ticker)
     trades_file.parent.mkdir(exist_ok=True)
     if not trades_file.exists():
         with trades_file.open("w", newline="") as f:
-            writer = csv.writer(f)
-            writer.writerow(
-                [
-                    "timestamp",
-                    "action",
-                    "option_type",
-                    "ticker",
-                    "strike",
-                    "expiry",
-                    "right",
-                    "price",
-                    "quantity",
-                    "delta",
-                    "gamma",
-                    "theta",
-                    "vega",
-                    "implied_volatility",
-                    "time_to_expiry_days",
-                    "underlying_price",
-                    "intrinsic_value",
-                    "time_value",
-                    "pnl",
-                    "cumulative_pnl",
-                    "commission",
-                    "contract_symbol",
-                    "notes",
-                ]
-            )
-
-
-def log_option_trade(
+            csv.writer(f).writerow(CSV_COLUMNS)
+
+
+async def log_option_trade(
     ib: IB,
     action: str,
     option_contract: Option,
@@ -65,13 +130,13 @@ def log_option_trade(
     notes: str = "",
 ):
     """Log comprehensive option trade data from ib_async objects and send Telegram notification"""
-    from ib_async import Stock
-
     ticker = option_contract.symbol
-    trades_file = Path(f"output/option_trades_{ticker}.csv")
 
-    # Get option Greeks and market data
-    option_tickers = ib.reqTickers(option_contract)
+    # Fetch option Greeks and underlying price concurrently - one round-trip
+    # to the gateway instead of three sequential ones
+    option_tickers, underlying_price = await asyncio.gather(
+        ib.reqTickersAsync(option_contract), _underlying_price(ib, ticker)
+    )
     option_ticker = option_tickers[0] if option_tickers else None
 
     delta = gamma = theta = vega = implied_volatility = 0.0
@@ -86,32 +151,17 @@ def log_option_trade(
             or 0.0
         )
 
-    # Get underlying price
-    stock = Stock(ticker, "SMART", "USD")
-    ib.qualifyContracts(stock)
-    stock_tickers = ib.reqTickers(stock)
-    underlying_price = stock_tickers[0].marketPrice() if stock_tickers else 0.0
-
-    # Clean up market data subscriptions
-    for t in option_tickers + stock_tickers:
-        if t.contract:
-            ib.cancelMktData(t.contract)
-
     # Calculate derived values
     strike = option_contract.strike
     right = option_contract.right
     expiry = option_contract.lastTradeDateOrContractMonth
 
-    intrinsic_value = (
-        max(0, underlying_price - strike)
-        if right == "C"
-        else max(0, strike - underlying_price)
-    )
+    intrinsic_value = max(0.0, (underlying_price - strike) * _RIGHT_SIGN[right])
     time_value = trade_price - intrinsic_value
 
     # Calculate time to expiry
     try:
-        expiry_date = datetime.datetime.strptime(expiry, "%Y%m%d").date()
+        expiry_date = parse_yyyymmdd(expiry)
         today = datetime.date.today()
         time_to_expiry_days = (expiry_date - today).days
     except ValueError:
@@ -120,88 +170,137 @@ def log_option_trade(
     # Generate contract symbol
     contract_symbol = f"{ticker} {expiry} {strike}{right}"
 
-    # Write to CSV
-    with trades_file.open("a", newline="") as f:
-        writer = csv.writer(f)
-        writer.writerow(
-            [
-                datetime.datetime.now().isoformat(),
-                action,
-                option_type,
+    # Write to CSV (line-buffered, so the row hits disk immediately)
+    _, writer = _trade_writer(ticker)
+    writer.writerow(
+        [
+            datetime.datetime.now().isoformat(),
+            action,
+            option_type,
+            ticker,
+            strike,
+            expiry,
+            right,
+            trade_price,
+            quantity,
+            f"{delta:.4f}",
+            f"{gamma:.4f}",
+            f"{theta:.4f}",
+            f"{vega:.4f}",
+            f"{implied_volatility:.4f}",
+            time_to_expiry_days,
+            f"{underlying_price:.2f}",
+            f"{intrinsic_value:.2f}",
+            f"{time_value:.2f}",
+            pnl,
+            cumulative_pnl,
+            commission,
+            contract_symbol,
+            notes,
+        ]
+    )
+
+    # Send Telegram notification if enabled - fired on an executor thread
+    # so the strategy loop doesn't block on the HTTPS round-trip
+    if SEND_TELEGRAM_NOTIFICATIONS:
+        asyncio.get_running_loop().run_in_executor(
+            None,
+            functools.partial(
+                tg.send_trade_alert,
+                f"{action} {option_type}",
                 ticker,
                 strike,
                 expiry,
-                right,
                 trade_price,
-                quantity,
-                round(delta, 4),
-                round(gamma, 4),
-                round(theta, 4),
-                round(vega, 4),
-                round(implied_volatility, 4),
-                time_to_expiry_days,
-                round(underlying_price, 2),
-                round(intrinsic_value, 2),
-                round(time_value, 2),
-                pnl,
-                cumulative_pnl,
-                commission,
-                contract_symbol,
-                notes,
-            ]
+                delta=delta,
+                pnl=pnl,
+                cumulative_pnl=cumulative_pnl,
+            ),
         )
 
-    # Send Telegram notification if enabled
-    if SEND_TELEGRAM_NOTIFICATIONS:
-        tg.send_trade_alert(
-            f"{action} {option_type}",
-            ticker,
-            strike,
-            expiry,
-            trade_price,
-            delta=delta,
-            pnl=pnl,
-            cumulative_pnl=cumulative_pnl,
-        )
+
+# Last parsed row per ticker, keyed by (mtime, size) so the tail read is
+# skipped entirely while the file hasn't changed
+_last_trade_cache: dict[str, tuple[tuple[float, int], dict[str, str]]] = {}
 
 
 def get_last_option_trade(ticker: str) -> dict[str, str] | None:
     """Get the last option trade from CSV as a dictionary"""
-    trades_file = Path(f"output/option_trades_{ticker}.csv")
+    trades_file = _trades_path(ticker)
     if not trades_file.exists():
         return None
 
-    with trades_file.open("r", newline="") as f:
-        lines = f.readlines()
-        if len(lines) <= 1:  # Only header or empty
+    st = trades_file.stat()
+    file_key = (st.st_mtime, st.st_size)
+    cached = _last_trade_cache.get(ticker)
+    if cached and cached[0] == file_key:
+        return cached[1]
+
+    with trades_file.open("rb") as f:
+        header = f.readline()
+        header_end = f.tell()
+        f.seek(0, 2)
+        end = f.tell()
+        if end <= header_end:  # Only header or empty
             return None
 
-        # Get header and last line
-        header = lines[0].strip()
-        last_line = lines[-1].strip()
+        # Read a small tail block from the end (growing if a line is longer)
+        # instead of scanning the whole file
+        block = 4096
+        while True:
+            start = max(header_end, end - block)
+            f.seek(start)
+            tail = f.read(end - start).rstrip(b"\n")
+            nl = tail.rfind(b"\n")
+            if nl != -1 or start == header_end:
+                last_line = tail[nl + 1 :]
+                break
+            block *= 2
+
+    if not last_line:
+        return None
 
-        # Parse as CSV
-        reader = csv.DictReader([header, last_line])
-        return next(reader)
+    # Parse as CSV
+    reader = csv.DictReader([header.decode().strip(), last_line.decode()])
+    row = next(reader)
+    _last_trade_cache[ticker] = (file_key, row)
+    return row
 
 
 def get_option_trades_summary(ticker: str) -> dict[str, int | float | dict[str, int]]:
-    """Get summary statistics from option trades"""
-    trades_file = Path(f"output/option_trades_{ticker}.csv")
+    """Get summary statistics from option trades in a single streaming pass"""
+    trades_file = _trades_path(ticker)
     if not trades_file.exists():
         return {}
 
-    df = pd.read_csv(trades_file)
+    with trades_file.open("r", newline="") as f:
+        reader = csv.reader(f)
+        header = next(reader, None)
+        if header is None:
+            return {}
 
-    if df.empty:
-        return {}
+        pnl_idx = header.index("pnl")
+        comm_idx = header.index("commission")
+        type_idx = header.index("option_type")
+
+        total_trades = 0
+        total_pnl = 0.0
+        total_commission = 0.0
+        trades_by_type: Counter[str] = Counter()
 
-    trades_by_type = df["option_type"].value_counts().to_dict()
+        for row in reader:
+            total_trades += 1
+            total_pnl += float(row[pnl_idx])
+            total_commission += float(row[comm_idx])
+            trades_by_type[row[type_idx]] += 1
+
+    if not total_trades:
+        return {}
 
     return {
-        "total_trades": len(df),
-        "total_pnl": df["pnl"].sum(),
-        "total_commission": df["commission"].sum(),
-        "trades_by_type": trades_by_type,
+        "total_trades": total_trades,
+        "total_pnl": total_pnl,
+        "total_commission": total_commission,
+        "trades_by_type": dict(trades_by_type),
         "net_pnl": total_pnl - total_commission,
     }
@@ -5,9 +5,13 @@ Buys ATM calls when no position, sells when position exists.
 Logs trades to CSV with timestamps and P&L.
 """
 
-import csv
+import asyncio
+import bisect
 import datetime
+import json
+import math
 import sys
+import time
 from pathlib import Path
 
 from ib_async import IB, MarketOrder, Option, Stock
@@ -19,6 +23,73 @@ PORT = 4002
 CLIENT_ID = 0  # Using 0 allows auto-incrementing if connection exists
 TICKER = "SPY"
 DTE_DAYS = 1
+RUN_TIME = datetime.time(9, 35)  # daily run, gateway-local time
+
+# Qualified underlyings, one qualify round-trip per process
+_stocks: dict[str, Stock] = {}
+
+# Option conIds keyed by contract tuple, persisted across daily runs so a
+# contract is only qualified against IB once in its lifetime
+QUAL_CACHE_FILE = Path("output/contract_cache.json")
+_qual_cache: dict[str, int] = (
+    json.loads(QUAL_CACHE_FILE.read_text()) if QUAL_CACHE_FILE.exists() else {}
+)
+
+
+async def qualify_option(ib: IB, option: Option) -> Option:
+    """Qualify an option contract, reusing cached conIds"""
+    key = (
+        f"{option.symbol}|{option.lastTradeDateOrContractMonth}"
+        f"|{option.strike}|{option.right}|{option.exchange}"
+    )
+    con_id = _qual_cache.get(key)
+    if con_id:
+        option.conId = con_id
+        return option
+
+    qualified = (await ib.qualifyContractsAsync(option))[0]
+    if qualified is None:
+        raise ValueError(f"Failed to qualify option contract for {option.symbol}")
+    _qual_cache[key] = qualified.conId
+    QUAL_CACHE_FILE.parent.mkdir(exist_ok=True)
+    QUAL_CACHE_FILE.write_text(json.dumps(_qual_cache))
+    return qualified
+
+
+async def get_stock(ib: IB, ticker: str) -> Stock:
+    """Qualify the underlying once and reuse it"""
+    stock = _stocks.get(ticker)
+    if stock is None:
+        stock = Stock(ticker, "SMART", "USD")
+        await ib.qualifyContractsAsync(stock)
+        _stocks[ticker] = stock
+    return stock
+
+
+async def get_expirations(ib: IB, stock: Stock) -> list[str]:
+    """Option-chain expirations, cached on disk per (ticker, day)
+
+    The chain is deterministic for a given day, so runs after the first
+    skip the reqSecDefOptParams round-trip. The date lives in the
+    filename, which makes stale entries self-invalidating.
+    """
+    cache_file = Path(
+        f"output/chain_{stock.symbol}_{datetime.date.today():%Y%m%d}.json"
+    )
+    if cache_file.exists():
+        return json.loads(cache_file.read_text())
+
+    chains = await ib.reqSecDefOptParamsAsync(
+        stock.symbol, "", stock.secType, stock.conId
+    )
+    seen: set[str] = set()
+    for chain in chains:
+        seen.update(chain.expirations)
+    expirations = sorted(seen)
+
+    cache_file.parent.mkdir(exist_ok=True)
+    cache_file.write_text(json.dumps(expirations))
+    return expirations
 
 
 def init_csv(ticker: str):
@@ -26,19 +97,7 @@ def init_csv(ticker: str):
     trades_file = Path(f"output/trades_{ticker}.csv")
     trades_file.parent.mkdir(exist_ok=True)
     if not trades_file.exists():
-        with trades_file.open("w", newline="") as f:
-            writer = csv.writer(f)
-            writer.writerow(
-                [
-                    "timestamp",
-                    "action",
-                    "ticker",
-                    "strike",
-                    "expiry",
-                    "price",
-                    "pnl",
-                ]
-            )
+        trades_file.write_bytes(b"timestamp,action,ticker,strike,expiry,price,pnl\n")
 
 
 def last_trade(ticker: str):
@@ -46,76 +105,157 @@ def last_trade(ticker: str):
     return log_n_notify.get_last_option_trade(ticker)
 
 
-def get_atm_option(ib: IB, ticker: str, dte_days: int, right: str = "C") -> Option:
+# Streaming tickers keyed by conId - the first price request subscribes,
+# every later read comes straight off the pushed last tick
+_mkt_tickers: dict[int, object] = {}
+
+
+async def market_price(ib: IB, contract, timeout: float = 5.0) -> float:
+    """Current market price from a persistent streaming subscription"""
+    ticker = _mkt_tickers.get(contract.conId)
+    if ticker is None:
+        ticker = ib.reqMktData(contract, "", False, False)
+        _mkt_tickers[contract.conId] = ticker
+
+    deadline = time.monotonic() + timeout
+    while math.isnan(ticker.marketPrice()):
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            break
+        try:
+            await asyncio.wait_for(ticker.updateEvent, remaining)
+        except asyncio.TimeoutError:
+            break
+    return ticker.marketPrice()
+
+
+def release_market_data(ib: IB, contract):
+    """Cancel one streaming subscription once its reader is done with it
+
+    Each day's option has a fresh conId, so the daemon loop would
+    otherwise accrue one market-data line per day until IB's cap turns
+    every quote into nan.
+    """
+    if _mkt_tickers.pop(contract.conId, None) is not None:
+        ib.cancelMktData(contract)
+
+
+def cancel_market_data(ib: IB):
+    """Tear down the streaming subscriptions on shutdown"""
+    for ticker in _mkt_tickers.values():
+        ib.cancelMktData(ticker.contract)
+    _mkt_tickers.clear()
+
+
+async def wait_for_fill(trade):
+    """Await order completion via trade events instead of polling
+
+    Each statusEvent wakes us the moment the gateway reports progress, so
+    fills are detected at network latency rather than on a 1s poll, and
+    other coroutines keep running during the wait. Like the baseline's
+    polling loop this waits as long as the order works - callers read
+    fill prices unconditionally, so returning early would log an unfilled
+    order as a $0.00 trade.
+    """
+    while not trade.isDone():
+        await trade.statusEvent
+
+
+async def get_atm_option(
+    ib: IB, ticker: str, dte_days: int, right: str = "C"
+) -> Option:
     """Get at-the-money option with target DTE"""
-    stock = Stock(ticker, "SMART", "USD")
-    ib.qualifyContracts(stock)
+    stock = await get_stock(ib, ticker)
 
-    tickers = ib.reqTickers(stock)
-    current_price = tickers[0].marketPrice()
+    # Price and option chain are independent - overlap the round-trips
+    # instead of paying them back to back
+    current_price, expirations = await asyncio.gather(
+        market_price(ib, stock), get_expirations(ib, stock)
+    )
     strike = round(current_price)
 
-    # Cancel market data subscription to avoid lingering connections
-    for ticker_obj in tickers:
-        if ticker_obj.contract:
-            ib.cancelMktData(ticker_obj.contract)
-
     target_date = datetime.date.today() + datetime.timedelta(days=dte_days)
-    chains = ib.reqSecDefOptParams(stock.symbol, "", stock.secType, stock.conId)
 
-    expirations: list[str] = []
-    for chain in chains:
-        expirations.extend(chain.expirations)
-    expirations = sorted(set(expirations))
+    # expirations is sorted (chronological == lexicographic for YYYYMMDD),
+    # so the closest expiry is one of the two neighbours of the bisect
+    # insertion point - no full scan needed
+    target_ord = target_date.toordinal()
+    exp_ords = [log_n_notify.parse_yyyymmdd(x).toordinal() for x in expirations]
+    i = bisect.bisect_left(exp_ords, target_ord)
+    lo = max(0, i - 1)
     closest_expiry = min(
-        expirations,
-        key=lambda x: abs(datetime.datetime.strptime(x, "%Y%m%d").date() - target_date),
-    )
+        zip(exp_ords[lo : i + 1], expirations[lo : i + 1]),
+        key=lambda p: abs(p[0] - target_ord),
+    )[1]
 
     option = Option(ticker, closest_expiry, strike, right, "SMART")
-    qualified = ib.qualifyContracts(option)
-    if qualified and isinstance(qualified[0], Option):
-        return qualified[0]
-    raise ValueError(f"Failed to qualify option contract for {ticker}")
+    return await qualify_option(ib, option)
 
 
-def buy_option(ib: IB, ticker: str, dte_days: int) -> bool:
-    """Buy a single option contract"""
-    option = get_atm_option(ib, ticker, dte_days, "C")
-    order = MarketOrder("BUY", 1)
-    trade = ib.placeOrder(option, order)
+async def buy_option(ib: IB, ticker: str, dte_days: int) -> bool:
+    """Buy an ATM call with an attached closing SELL in one submission
 
-    while not trade.isDone():
-        ib.sleep(1)
+    The parent BUY is held (transmit=False) and goes to the gateway
+    together with its attached SELL, so one batch covers the whole
+    round-trip instead of two day-apart submissions.
+    """
+    option = await get_atm_option(ib, ticker, dte_days, "C")
+
+    parent = MarketOrder("BUY", 1)
+    parent.orderId = ib.client.getReqId()
+    parent.transmit = False
+    child = MarketOrder("SELL", 1)
+    child.orderId = ib.client.getReqId()
+    child.parentId = parent.orderId
+    child.transmit = True
 
-    fill_price = trade.orderStatus.avgFillPrice
+    buy_trade = ib.placeOrder(option, parent)
+    sell_trade = ib.placeOrder(option, child)
+
+    await wait_for_fill(buy_trade)
+    fill_price = buy_trade.orderStatus.avgFillPrice
     print(f"Bought {ticker} {option.strike} Call @ ${fill_price:.2f}")
 
     # Log to comprehensive option trades CSV
-    log_n_notify.log_option_trade(
+    await log_n_notify.log_option_trade(
         ib=ib,
         action="BUY",
         option_contract=option,
         trade_price=fill_price,
         option_type="CALL",
-        notes="ATM call purchase",
+        notes="ATM call purchase (bracketed)",
+    )
+
+    await wait_for_fill(sell_trade)
+    exit_price = sell_trade.orderStatus.avgFillPrice
+    pnl = (exit_price - fill_price) * 100
+    print(f"Sold {ticker} {option.strike} Call @ ${exit_price:.2f}")
+    print(f"P&L: ${pnl:.2f}")
+
+    await log_n_notify.log_option_trade(
+        ib=ib,
+        action="SELL",
+        option_contract=option,
+        trade_price=exit_price,
+        option_type="CALL",
+        pnl=pnl,
+        notes="Attached closing sell",
     )
 
     return True
 
 
-def sell_option(
+async def sell_option(
     ib: IB, ticker: str, strike: float, expiry: str, entry_price: float
 ) -> bool:
     """Sell the current option position reconstructed from CSV"""
     option = Option(ticker, expiry, strike, "C", "SMART")
-    contract = ib.qualifyContracts(option)[0]
+    contract = await qualify_option(ib, option)
 
     order = MarketOrder("SELL", 1)
     trade = ib.placeOrder(contract, order)
 
-    while not trade.isDone():
-        ib.sleep(1)
+    await wait_for_fill(trade)
 
     exit_price = trade.orderStatus.avgFillPrice
     pnl = (exit_price - entry_price) * 100
@@ -124,7 +264,7 @@ def sell_option(
     print(f"P&L: ${pnl:.2f}")
 
     # Log to comprehensive option trades CSV
-    log_n_notify.log_option_trade(
+    await log_n_notify.log_option_trade(
         ib=ib,
         action="SELL",
         option_contract=contract,
@@ -137,7 +277,7 @@ def sell_option(
     return True
 
 
-def display_position(ib: IB, ticker: str):
+async def display_position(ib: IB, ticker: str):
     """Display current position"""
     print("\n" + "=" * 50)
     print(f"POSITION STATUS - {ticker}")
@@ -146,58 +286,80 @@ def display_position(ib: IB, ticker: str):
     last = last_trade(ticker)
     if last and last["action"] == "BUY":
         print(f"Position: LONG {last['strike']} Call")
-        print(f"Entry Price: ${last['price']:.2f}")
+        print(f"Entry Price: ${float(last['price']):.2f}")
         print(f"Entry Time: {last['timestamp']}")
         print(f"Expiry: {last['expiry']}")
         option = Option(
             ticker, str(last["expiry"]), float(last["strike"]), "C", "SMART"
         )
-        contract = ib.qualifyContracts(option)[0]
-        tickers = ib.reqTickers(contract)
-        current_price = tickers[0].marketPrice()
+        contract = await qualify_option(ib, option)
+        current_price = await market_price(ib, contract)
+        release_market_data(ib, contract)
         pnl = (current_price - float(last["price"])) * 100
         print(f"Current Price: ${current_price:.2f}")
         print(f"Unrealized P&L: ${pnl:.2f}")
-
-        # Cancel market data subscription
-        for ticker_obj in tickers:
-            if ticker_obj.contract:
-                ib.cancelMktData(ticker_obj.contract)
     else:
         print("No active position")
 
     print("=" * 50 + "\n")
 
 
-def run_daily(ib: IB, ticker: str, dte_days: int):
-    """Run daily trading logic"""
+async def run_daily(ib: IB, ticker: str, dte_days: int) -> str:
+    """Run daily trading logic; returns the action taken"""
     print(f"=== Daily Run for {ticker} ===")
 
     last = last_trade(ticker)
     if last and last["action"] == "BUY":
         print("Have position - selling")
-        sell_option(
+        await sell_option(
             ib, ticker, float(last["strike"]), str(last["expiry"]), float(last["price"])
         )
-    else:
-        print("No position - buying")
-        buy_option(ib, ticker, dte_days)
+        return "SELL"
+
+    print("No position - buying")
+    await buy_option(ib, ticker, dte_days)
+    return "BUY"
 
-    display_position(ib, ticker)
 
+def seconds_until_next_run() -> float:
+    """Seconds until the next daily RUN_TIME"""
+    now = datetime.datetime.now()
+    next_run = datetime.datetime.combine(now.date(), RUN_TIME)
+    if next_run <= now:
+        next_run += datetime.timedelta(days=1)
+    return (next_run - now).total_seconds()
 
-def main():
-    """Main entry point - connect to IB and run strategy"""
+
+async def main():
+    """Main entry point - connect to IB once and run daily as a daemon
+
+    One connection serves every daily run, so the gateway handshake is
+    paid once per session instead of once per day. Runs immediately on
+    start, then at RUN_TIME each following day.
+    """
     ib = IB()
 
     try:
         print(f"Connecting to IB on port {PORT}...")
-        ib.connect("127.0.0.1", PORT, clientId=CLIENT_ID)
+        await ib.connectAsync("127.0.0.1", PORT, clientId=CLIENT_ID)
         print("Connected")
 
         init_csv(TICKER)
         log_n_notify.init_option_trades_csv(TICKER)
-        run_daily(ib, TICKER, DTE_DAYS)
+
+        while True:
+            action = await run_daily(ib, TICKER, DTE_DAYS)
+
+            # After a closing SELL there is no position - skip the
+            # qualify/ticker round-trips the status display would pay
+            if action == "BUY":
+                await display_position(ib, TICKER)
+            else:
+                print("Position closed")
+
+            delay = seconds_until_next_run()
+            print(f"Next run in {delay / 3600:.1f}h")
+            await asyncio.sleep(delay)
 
     except Exception as e:
         print(f"Error: {e}")
@@ -205,6 +367,7 @@ def main():
     finally:
         # Always disconnect properly
         if ib.isConnected():
+            cancel_market_data(ib)
             ib.disconnect()
             print("Disconnected from IB")
 
@@ -214,19 +377,19 @@ def main():
 if __name__ == "__main__":
     """
     Simple Option Trading Strategy
-    
+
     Configuration (edit at top of file):
     - PORT: IB connection port (default: 4002)
     - TICKER: Stock to trade options on (default: "SPY")
     - DTE_DAYS: Days to expiration (default: 1)
-    
+
     Files created:
     - output/trades_SPY.csv: Trade log with timestamps and P&L
-    
+
     Usage:
         python strategy.py
-    
+
     Requirements:
         pip install ib_async
     """
-    sys.exit(main())
+    sys.exit(asyncio.run(main()))
@@ -5,16 +5,19 @@ Based on algorithm.md - buys LEAPS and sells short calls against it
 Includes comprehensive stop loss protection for the LEAPS position
 """
 
+import asyncio
+import bisect
 import csv
 import datetime
-import json
 import sys
-from dataclasses import asdict, dataclass
+from dataclasses import dataclass
 from pathlib import Path
-from typing import Optional
 
+import numpy as np
+import orjson
 from ib_async import IB, Contract, LimitOrder, MarketOrder, Option, Stock
 
+import analytics
 import log_n_notify
 import telegram_bot as tg
 
@@ -35,6 +38,9 @@ MAX_LOSS_PERCENTAGE = 200.0
 MAX_LOSS_ABSOLUTE = 100.0
 ROLL_TRIGGER_DELTA = 0.5
 
+# Rate used for locally computed Black-Scholes deltas
+RISK_FREE_RATE = 0.05
+
 # Stop Loss Parameters
 LEAPS_STOP_LOSS_PERCENTAGE = 20.0
 LEAPS_STOP_LOSS_ABSOLUTE = 500.0
@@ -43,22 +49,24 @@ TRAILING_STOP_ENABLED = True
 TRAILING_STOP_PERCENTAGE = 15.0
 
 
-@dataclass
+@dataclass(slots=True)
 class PMCCState:
     """Track state of PMCC position"""
 
     # LEAPS tracking
-    leaps_strike: Optional[float] = None
-    leaps_expiry: Optional[str] = None
-    leaps_original_cost: Optional[float] = None
-    leaps_high_water_mark: Optional[float] = None
-    position_opened_date: Optional[str] = None
+    leaps_strike: float | None = None
+    leaps_expiry: str | None = None
+    leaps_con_id: int | None = None
+    leaps_original_cost: float | None = None
+    leaps_high_water_mark: float | None = None
+    position_opened_date: str | None = None
     stop_loss_triggered: bool = False
 
     # Short call tracking
-    short_strike: Optional[float] = None
-    short_expiry: Optional[str] = None
-    short_original_premium: Optional[float] = None
+    short_strike: float | None = None
+    short_expiry: str | None = None
+    short_con_id: int | None = None
+    short_original_premium: float | None = None
 
     # P&L tracking
     total_short_premium_collected: float = 0.0
@@ -70,18 +78,50 @@ def load_state(ticker: str) -> PMCCState:
     state_file = Path(f"output/state_{ticker}.json")
     state_file.parent.mkdir(exist_ok=True)
     if state_file.exists():
-        with state_file.open("r") as f:
-            data = json.load(f)
-            return PMCCState(**data)
+        return PMCCState(**orjson.loads(state_file.read_bytes()))
     return PMCCState()
 
 
+# Set by save_state, cleared by flush_state - the JSON blob hits disk
+# once per run instead of after every mutation
+_state_dirty = False
+
+
 def save_state(ticker: str, state: PMCCState):
-    """Save state to JSON file"""
+    """Mark state dirty; flush_state writes it once at end of run"""
+    global _state_dirty
+    _state_dirty = True
+
+
+def flush_state(ticker: str, state: PMCCState):
+    """Write state to its JSON file atomically, if anything changed"""
+    global _state_dirty
+    if not _state_dirty:
+        return
     state_file = Path(f"output/state_{ticker}.json")
     state_file.parent.mkdir(exist_ok=True)
-    with state_file.open("w") as f:
-        json.dump(asdict(state), f, indent=2, default=str)
+    tmp = state_file.with_suffix(".json.tmp")
+    # orjson serializes the dataclass natively, straight to bytes
+    tmp.write_bytes(orjson.dumps(state))
+    tmp.replace(state_file)
+    _state_dirty = False
+
+
+# Legacy trades CSV layout - header only; trade rows go through
+# log_n_notify's comprehensive CSV
+CSV_COLUMNS = (
+    "timestamp",
+    "action",
+    "type",
+    "ticker",
+    "strike",
+    "expiry",
+    "price",
+    "delta",
+    "pnl",
+    "cumulative_pnl",
+    "notes",
+)
 
 
 def init_csv(ticker: str):
@@ -90,139 +130,256 @@ def init_csv(ticker: str):
     trades_file.parent.mkdir(exist_ok=True)
     if not trades_file.exists():
         with trades_file.open("w", newline="") as f:
-            writer = csv.writer(f)
-            writer.writerow(
-                [
-                    "timestamp",
-                    "action",
-                    "type",
-                    "ticker",
-                    "strike",
-                    "expiry",
-                    "price",
-                    "delta",
-                    "pnl",
-                    "cumulative_pnl",
-                    "notes",
-                ]
-            )
+            csv.writer(f).writerow(CSV_COLUMNS)
+
+
+async def qualify_many(ib: IB, contracts: list[Option]) -> list[Option]:
+    """Qualify a batch of contracts in one concurrent burst
+
+    Returns only the contracts IB could qualify, so callers can drop the
+    per-contract try/except.
+    """
+    if not contracts:
+        return []
+    # qualifyContractsAsync keeps positional alignment by leaving None in
+    # the slot of every contract IB couldn't resolve - drop those here
+    result = await ib.qualifyContractsAsync(*contracts)
+    return [c for c in result if c is not None]
+
+
+# Qualified position contracts keyed by conId - each position is
+# qualified against IB once at open and reused for every later check
+_contract_cache: dict[int, Contract] = {}
+
+# Short-call snapshot left by check_leaps_stop_loss, consumed by
+# manage_short_call in the same run so the quote is fetched once
+_short_quote: dict[int, object] = {}
+
+
+async def get_leaps_contract(ib: IB, ticker: str, state: PMCCState) -> Contract:
+    """Qualified LEAPS contract, cached across calls via the stored conId"""
+    contract = _contract_cache.get(state.leaps_con_id)
+    if contract is None:
+        option = Option(
+            ticker, str(state.leaps_expiry), state.leaps_strike, "C", "SMART"
+        )
+        contract = (await ib.qualifyContractsAsync(option))[0]
+        if contract is None:
+            raise ValueError(f"Failed to qualify LEAPS contract for {ticker}")
+        state.leaps_con_id = contract.conId
+        _contract_cache[contract.conId] = contract
+    return contract
+
+
+async def get_short_contract(ib: IB, ticker: str, state: PMCCState) -> Contract:
+    """Qualified short-call contract, cached across calls via the stored conId"""
+    contract = _contract_cache.get(state.short_con_id)
+    if contract is None:
+        option = Option(
+            ticker, str(state.short_expiry), float(state.short_strike), "C", "SMART"
+        )
+        contract = (await ib.qualifyContractsAsync(option))[0]
+        if contract is None:
+            raise ValueError(f"Failed to qualify short call contract for {ticker}")
+        state.short_con_id = contract.conId
+        _contract_cache[contract.conId] = contract
+    return contract
+
+
+def fill_missing_deltas(
+    deltas: np.ndarray, contracts: list, tickers: list, spot: float, expiry: str
+) -> np.ndarray:
+    """Fill nan deltas with a local vectorized Black-Scholes estimate
+
+    IB's model greeks often lag right after a snapshot; instead of
+    dropping those strikes or re-requesting, compute their call deltas
+    in one bs_greeks pass using the median reported IV as sigma.
+    """
+    missing = np.isnan(deltas)
+    if not missing.any() or missing.all():
+        return deltas
+
+    ivs = np.fromiter(
+        (
+            (t.modelGreeks.impliedVol or np.nan) if t.modelGreeks else np.nan
+            for t in tickers
+        ),
+        dtype=np.float64,
+        count=len(tickers),
+    )
+    sigma = np.nanmedian(ivs)
+    if np.isnan(sigma):
+        return deltas
+
+    dte = (log_n_notify.parse_yyyymmdd(expiry) - datetime.date.today()).days
+    t_years = max(dte, 1) / 365.0
+    strikes = np.fromiter(
+        (c.strike for c in contracts), dtype=np.float64, count=len(contracts)
+    )
+    deltas[missing] = analytics.bs_greeks(
+        spot, strikes[missing], t_years, RISK_FREE_RATE, sigma, True
+    )[0]
+    return deltas
+
+
+async def wait_for_fill(trade) -> None:
+    """Suspend until the order is done, waking on each status event
+
+    Fills are seen at network latency instead of on a 1s poll, and the
+    event loop stays free for market-data callbacks meanwhile.
+    """
+    while not trade.isDone():
+        await trade.statusEvent
 
 
-def get_option_delta(ib: IB, option: Contract) -> float:
+async def get_option_delta(ib: IB, option: Contract) -> float:
     """Get current delta for an option"""
-    tickers = ib.reqTickers(option)
+    tickers = await ib.reqTickersAsync(option)
     if tickers and tickers[0].modelGreeks:
         return tickers[0].modelGreeks.delta or 0.0
     return 0.0
 
 
-def find_leaps_option(ib: IB, ticker: str) -> Option | None:
-    """Find best LEAPS option matching criteria"""
-    stock = Stock(ticker, "SMART", "USD")
-    ib.qualifyContracts(stock)
+# Qualified underlyings and per-day chain snapshots, shared by both
+# finders so each run pays one qualify and one reqSecDefOptParams
+_stocks: dict[str, Stock] = {}
+_chain_cache: dict[tuple[str, datetime.date], tuple[np.ndarray, list[str]]] = {}
 
-    tickers = ib.reqTickers(stock)
-    current_price = tickers[0].marketPrice()
 
-    target_date = datetime.date.today() + datetime.timedelta(days=LEAPS_MIN_DTE)
-    chains = ib.reqSecDefOptParams(stock.symbol, "", stock.secType, stock.conId)
+async def get_stock(ib: IB, ticker: str) -> Stock:
+    """Qualify the underlying once and reuse it"""
+    stock = _stocks.get(ticker)
+    if stock is None:
+        stock = Stock(ticker, "SMART", "USD")
+        await ib.qualifyContractsAsync(stock)
+        _stocks[ticker] = stock
+    return stock
+
 
-    # Get all strikes and expirations from chains
-    all_strikes = set()
-    valid_expirations = []
+async def chain_snapshot(ib: IB, ticker: str) -> tuple[np.ndarray, list[str]]:
+    """(unique strikes, sorted expirations) for the main trading class
 
+    Fetched once per (ticker, day) - the chain doesn't change intraday
+    for our purposes, so the second finder in a run hits the cache.
+    """
+    key = (ticker, datetime.date.today())
+    cached = _chain_cache.get(key)
+    if cached:
+        return cached
+
+    stock = await get_stock(ib, ticker)
+    chains = await ib.reqSecDefOptParamsAsync(
+        stock.symbol, "", stock.secType, stock.conId
+    )
+
+    strike_arrays = []
+    expirations: set[str] = set()
     for chain in chains:
         if chain.tradingClass == ticker:  # Use main trading class only
-            for exp in chain.expirations:
-                exp_date = datetime.datetime.strptime(exp, "%Y%m%d").date()
-                if exp_date >= target_date:
-                    valid_expirations.append(exp)
-                    all_strikes.update(chain.strikes)
+            expirations.update(chain.expirations)
+            strike_arrays.append(np.asarray(chain.strikes, dtype=np.float64))
+
+    # No chain for this trading class: hand the finders empty arrays so
+    # their "nothing found" paths fire instead of crashing concatenate
+    strikes = np.unique(np.concatenate(strike_arrays)) if strike_arrays else np.empty(0)
+    snapshot = (strikes, sorted(expirations))
+    _chain_cache[key] = snapshot
+    return snapshot
+
 
-    if not valid_expirations:
+async def find_leaps_option(ib: IB, ticker: str) -> Option | None:
+    """Find best LEAPS option matching criteria"""
+    stock = await get_stock(ib, ticker)
+
+    tickers = await ib.reqTickersAsync(stock)
+    current_price = tickers[0].marketPrice()
+
+    target_date = datetime.date.today() + datetime.timedelta(days=LEAPS_MIN_DTE)
+    strikes, expirations = await chain_snapshot(ib, ticker)
+
+    # Sorted YYYYMMDD compares chronologically: the first expiration at
+    # or past the target date is the closest valid LEAPS expiry
+    i = bisect.bisect_left(expirations, f"{target_date:%Y%m%d}")
+    if i == len(expirations):
         print(f"No LEAPS found with DTE >= {LEAPS_MIN_DTE}")
         return None
-
-    # Sort and get closest expiry
-    valid_expirations = sorted(set(valid_expirations))
-    closest_expiry = valid_expirations[0]
+    closest_expiry = expirations[i]
 
     # Filter strikes near current price for LEAPS (80-110% of spot)
     min_strike = current_price * 0.8
     max_strike = current_price * 1.1
-    test_strikes = sorted(
-        [int(s) for s in all_strikes if min_strike <= s <= max_strike]
-    )
+    mask = (strikes >= min_strike) & (strikes <= max_strike)
+    test_strikes = strikes[mask].astype(int).tolist()
 
     print(f"Testing {len(test_strikes)} strikes for LEAPS (exp {closest_expiry})...")
 
-    best_option = None
-    best_delta_diff = float("inf")
-
-    for strike in test_strikes:
-        option = Option(ticker, closest_expiry, strike, "C", "SMART")
-        try:
-            contract = ib.qualifyContracts(option)[0]
-            delta = get_option_delta(ib, contract)
-
-            if delta == 0:  # Skip if no delta available
-                continue
-
-            delta_diff = abs(delta - LEAPS_DELTA_TARGET)
-
-            if delta >= LEAPS_DELTA_TARGET - 0.15 and delta_diff < best_delta_diff:
-                best_option = contract
-                best_delta_diff = delta_diff
+    # Qualify all candidate strikes in one burst instead of per strike
+    candidates = [
+        Option(ticker, closest_expiry, strike, "C", "SMART") for strike in test_strikes
+    ]
+    contracts = await qualify_many(ib, candidates)
+    if not contracts:
+        print("No contracts could be qualified")
+        return None
 
-        except Exception:
-            continue
+    # One ticker wave for every candidate instead of a reqTickers
+    # round-trip per strike
+    all_tickers = await ib.reqTickersAsync(*contracts)
+
+    # Vectorized selection: abs delta distance with out-of-range and
+    # missing-greeks candidates masked to inf, then one argmin
+    deltas = np.fromiter(
+        (
+            (t.modelGreeks.delta or np.nan) if t.modelGreeks else np.nan
+            for t in all_tickers
+        ),
+        dtype=np.float64,
+        count=len(all_tickers),
+    )
+    deltas = fill_missing_deltas(
+        deltas, contracts, all_tickers, current_price, closest_expiry
+    )
+    diff = np.abs(deltas - LEAPS_DELTA_TARGET)
+    diff[~(deltas >= LEAPS_DELTA_TARGET - 0.15)] = np.inf
 
-    if best_option:
-        delta = get_option_delta(ib, best_option)
-        print(f"Selected LEAPS: Strike ${best_option.strike}, Delta {delta:.3f}")
+    idx = int(np.argmin(diff))
+    if not np.isfinite(diff[idx]):
+        return None
 
+    best_option = contracts[idx]
+    print(f"Selected LEAPS: Strike ${best_option.strike}, Delta {deltas[idx]:.3f}")
     return best_option
 
 
-def find_short_option(ib: IB, ticker: str, leaps_strike: float) -> Option | None:
+async def find_short_option(ib: IB, ticker: str, leaps_strike: float) -> Option | None:
     """Find best short call option to sell"""
-    stock = Stock(ticker, "SMART", "USD")
-    ib.qualifyContracts(stock)
+    stock = await get_stock(ib, ticker)
 
-    tickers = ib.reqTickers(stock)
+    tickers = await ib.reqTickersAsync(stock)
     current_price = tickers[0].marketPrice()
 
     target_date = datetime.date.today() + datetime.timedelta(days=SHORT_DTE_TARGET)
-    chains = ib.reqSecDefOptParams(stock.symbol, "", stock.secType, stock.conId)
-
-    # Get all strikes and find closest expiry to target
-    all_strikes = set()
-    all_expirations = []
-
-    for chain in chains:
-        if chain.tradingClass == ticker:  # Use main trading class only
-            all_expirations.extend(chain.expirations)
-            all_strikes.update(chain.strikes)
+    strikes, all_expirations = await chain_snapshot(ib, ticker)
 
     if not all_expirations:
         print("No expirations found")
         return None
 
-    all_expirations = sorted(set(all_expirations))
-
-    # Find expiry closest to target DTE
+    # Sorted YYYYMMDD compares chronologically, so the expiry closest to
+    # target DTE is one of the two bisect neighbours - no full scan
+    target_ord = target_date.toordinal()
+    i = bisect.bisect_left(all_expirations, f"{target_date:%Y%m%d}")
     closest_expiry = min(
-        all_expirations,
-        key=lambda x: abs(datetime.datetime.strptime(x, "%Y%m%d").date() - target_date),
+        all_expirations[max(0, i - 1) : i + 1],
+        key=lambda x: abs(log_n_notify.parse_yyyymmdd(x).toordinal() - target_ord),
     )
 
     # Filter strikes - focus on OTM strikes likely to have delta near target
     # For 0.30 delta, strikes are typically 2-5% OTM
     min_strike = max(int(leaps_strike) + 1, int(current_price * 1.01))
     max_strike = int(current_price * 1.08)
-    test_strikes = sorted(
-        [int(s) for s in all_strikes if min_strike <= s <= max_strike]
-    )
+    mask = (strikes >= min_strike) & (strikes <= max_strike)
+    test_strikes = strikes[mask].astype(int).tolist()
 
     if not test_strikes:
         print(f"No suitable strikes found above LEAPS ${leaps_strike}")
@@ -233,14 +390,13 @@ def find_short_option(ib: IB, ticker: str, leaps_strike: float) -> Option | None
     )
 
     # Batch qualify all contracts first
-    option_contracts = []
-    for strike in test_strikes:
-        option = Option(ticker, closest_expiry, strike, "C", "SMART")
-        try:
-            contract = ib.qualifyContracts(option)[0]
-            option_contracts.append(contract)
-        except Exception:
-            continue
+    option_contracts = await qualify_many(
+        ib,
+        [
+            Option(ticker, closest_expiry, strike, "C", "SMART")
+            for strike in test_strikes
+        ],
+    )
 
     if not option_contracts:
         print("No contracts could be qualified")
@@ -248,39 +404,47 @@ def find_short_option(ib: IB, ticker: str, leaps_strike: float) -> Option | None
 
     # Request tickers for all contracts at once (much faster)
     print(f"Requesting data for {len(option_contracts)} options...")
-    all_tickers = ib.reqTickers(*option_contracts)
-
-    best_option = None
-    best_delta_diff = float("inf")
-
-    for ticker_data, contract in zip(all_tickers, option_contracts):
-        if ticker_data.modelGreeks and ticker_data.modelGreeks.delta:
-            delta = ticker_data.modelGreeks.delta
-            delta_diff = abs(delta - SHORT_DELTA_TARGET)
-
-            if delta <= SHORT_DELTA_TARGET + 0.15 and delta_diff < best_delta_diff:
-                best_option = contract
-                best_delta_diff = delta_diff
+    all_tickers = await ib.reqTickersAsync(*option_contracts)
+
+    deltas = np.fromiter(
+        (
+            (t.modelGreeks.delta or np.nan) if t.modelGreeks else np.nan
+            for t in all_tickers
+        ),
+        dtype=np.float64,
+        count=len(all_tickers),
+    )
+    deltas = fill_missing_deltas(
+        deltas, option_contracts, all_tickers, current_price, closest_expiry
+    )
+    diff = np.abs(deltas - SHORT_DELTA_TARGET)
+    diff[~(deltas <= SHORT_DELTA_TARGET + 0.15)] = np.inf
 
-    if best_option:
-        delta = get_option_delta(ib, best_option)
-        print(f"Selected short call: Strike ${best_option.strike}, Delta {delta:.3f}")
+    idx = int(np.argmin(diff))
+    if not np.isfinite(diff[idx]):
+        return None
 
+    best_option = option_contracts[idx]
+    print(f"Selected short call: Strike ${best_option.strike}, Delta {deltas[idx]:.3f}")
     return best_option
 
 
-def buy_leaps(ib: IB, ticker: str, state: PMCCState, use_limit: bool = False) -> bool:
+async def buy_leaps(
+    ib: IB, ticker: str, state: PMCCState, use_limit: bool = False
+) -> bool:
     """Buy LEAPS call option"""
-    option = find_leaps_option(ib, ticker)
+    option = await find_leaps_option(ib, ticker)
     if not option:
         print("No suitable LEAPS found")
         return False
 
     if use_limit:
         # Get current bid/ask for limit order
-        tickers = ib.reqTickers(option)
-        if tickers and tickers[0].bid and tickers[0].ask:
-            mid_price = (tickers[0].bid + tickers[0].ask) / 2
+        tickers = await ib.reqTickersAsync(option)
+        ticker_data = tickers[0] if tickers else None
+        bid, ask = (ticker_data.bid, ticker_data.ask) if ticker_data else (0.0, 0.0)
+        if bid and ask:
+            mid_price = (bid + ask) / 2
             # Place limit order slightly above mid
             limit_price = round(mid_price * 1.005, 2)
             print(f"Placing limit order at ${limit_price:.2f} (mid: ${mid_price:.2f})")
@@ -293,14 +457,15 @@ def buy_leaps(ib: IB, ticker: str, state: PMCCState, use_limit: bool = False) ->
 
     trade = ib.placeOrder(option, order)
 
-    while not trade.isDone():
-        ib.sleep(1)
+    await wait_for_fill(trade)
 
     fill_price = trade.orderStatus.avgFillPrice
-    delta = get_option_delta(ib, option)
+    delta = await get_option_delta(ib, option)
 
     state.leaps_strike = option.strike
     state.leaps_expiry = option.lastTradeDateOrContractMonth
+    state.leaps_con_id = option.conId
+    _contract_cache[option.conId] = option
     state.leaps_original_cost = fill_price * 100
     state.leaps_high_water_mark = fill_price * 100
     state.position_opened_date = datetime.datetime.now().isoformat()
@@ -315,7 +480,7 @@ def buy_leaps(ib: IB, ticker: str, state: PMCCState, use_limit: bool = False) ->
     )
 
     # Log option trade with comprehensive data and Telegram notification
-    log_n_notify.log_option_trade(
+    await log_n_notify.log_option_trade(
         ib=ib,
         action="BUY",
         option_contract=option,
@@ -330,13 +495,13 @@ def buy_leaps(ib: IB, ticker: str, state: PMCCState, use_limit: bool = False) ->
     return True
 
 
-def sell_short_call(ib: IB, ticker: str, state: PMCCState) -> bool:
+async def sell_short_call(ib: IB, ticker: str, state: PMCCState) -> bool:
     """Sell short call against LEAPS"""
     if not state.leaps_strike:
         print("No LEAPS position to sell against")
         return False
 
-    option = find_short_option(ib, ticker, state.leaps_strike)
+    option = await find_short_option(ib, ticker, state.leaps_strike)
     if not option:
         print("No suitable short call found")
         return False
@@ -344,14 +509,15 @@ def sell_short_call(ib: IB, ticker: str, state: PMCCState) -> bool:
     order = MarketOrder("SELL", 1)
     trade = ib.placeOrder(option, order)
 
-    while not trade.isDone():
-        ib.sleep(1)
+    await wait_for_fill(trade)
 
     fill_price = trade.orderStatus.avgFillPrice
-    delta = get_option_delta(ib, option)
+    delta = await get_option_delta(ib, option)
 
     state.short_strike = option.strike
     state.short_expiry = option.lastTradeDateOrContractMonth
+    state.short_con_id = option.conId
+    _contract_cache[option.conId] = option
     state.short_original_premium = fill_price * 100
     state.total_short_premium_collected += fill_price * 100
 
@@ -361,7 +527,7 @@ def sell_short_call(ib: IB, ticker: str, state: PMCCState) -> bool:
     print(f"Premium: ${fill_price:.2f} Delta: {delta:.3f}")
 
     # Log option trade with comprehensive data and Telegram notification
-    log_n_notify.log_option_trade(
+    await log_n_notify.log_option_trade(
         ib=ib,
         action="SELL",
         option_contract=option,
@@ -376,24 +542,17 @@ def sell_short_call(ib: IB, ticker: str, state: PMCCState) -> bool:
     return True
 
 
-def close_short_call(ib: IB, ticker: str, state: PMCCState, reason: str) -> bool:
+async def close_short_call(ib: IB, ticker: str, state: PMCCState, reason: str) -> bool:
     """Buy back short call"""
     if not state.short_strike:
         return False
 
-    option = Option(
-        ticker, str(state.short_expiry), float(state.short_strike), "C", "SMART"
-    )
-    qualified = ib.qualifyContracts(option)
-    contract = (
-        qualified[0] if qualified and isinstance(qualified[0], Option) else option
-    )
+    contract = await get_short_contract(ib, ticker, state)
 
     order = MarketOrder("BUY", 1)
     trade = ib.placeOrder(contract, order)
 
-    while not trade.isDone():
-        ib.sleep(1)
+    await wait_for_fill(trade)
 
     exit_price = trade.orderStatus.avgFillPrice
     pnl = state.short_original_premium - (exit_price * 100)
@@ -403,7 +562,7 @@ def close_short_call(ib: IB, ticker: str, state: PMCCState, reason: str) -> bool
     print(f"P&L on trade: ${pnl:.2f}")
 
     # Log option trade with comprehensive data and Telegram notification
-    log_n_notify.log_option_trade(
+    await log_n_notify.log_option_trade(
         ib=ib,
         action="BUY_TO_CLOSE",
         option_contract=contract,
@@ -416,28 +575,40 @@ def close_short_call(ib: IB, ticker: str, state: PMCCState, reason: str) -> bool
 
     state.short_strike = None
     state.short_expiry = None
+    state.short_con_id = None
     state.short_original_premium = None
 
     save_state(ticker, state)
     return True
 
 
-def roll_short_call(ib: IB, ticker: str, state: PMCCState) -> bool:
+async def roll_short_call(ib: IB, ticker: str, state: PMCCState) -> bool:
     """Roll short call to new strike/expiry"""
     print("Rolling short call...")
-    if close_short_call(ib, ticker, state, "Rolling to new position"):
-        return sell_short_call(ib, ticker, state)
+    if await close_short_call(ib, ticker, state, "Rolling to new position"):
+        return await sell_short_call(ib, ticker, state)
     return False
 
 
-def check_leaps_stop_loss(ib: IB, ticker: str, state: PMCCState) -> bool:
+async def check_leaps_stop_loss(ib: IB, ticker: str, state: PMCCState) -> bool:
     """Check if LEAPS stop loss triggered"""
     if state.stop_loss_triggered or not state.leaps_strike or not state.leaps_expiry:
         return False
 
-    option = Option(ticker, state.leaps_expiry, state.leaps_strike, "C", "SMART")
-    contract = ib.qualifyContracts(option)[0]
-    tickers = ib.reqTickers(contract)
+    contract = await get_leaps_contract(ib, ticker, state)
+
+    # Fetch LEAPS and short-call quotes in one reqTickers round-trip
+    has_short = bool(
+        state.short_strike and state.short_expiry and state.short_original_premium
+    )
+    if has_short:
+        short_contract = await get_short_contract(ib, ticker, state)
+        tickers = await ib.reqTickersAsync(contract, short_contract)
+        # Stash the snapshot so manage_short_call skips its own request
+        _short_quote[short_contract.conId] = tickers[1]
+    else:
+        tickers = await ib.reqTickersAsync(contract)
+
     current_price = tickers[0].marketPrice() * 100
 
     # Update trailing stop
@@ -453,11 +624,8 @@ def check_leaps_stop_loss(ib: IB, ticker: str, state: PMCCState) -> bool:
 
     # Include short call value
     short_value = 0
-    if state.short_strike and state.short_expiry and state.short_original_premium:
-        short_opt = Option(ticker, state.short_expiry, state.short_strike, "C", "SMART")
-        short_contract = ib.qualifyContracts(short_opt)[0]
-        short_tickers = ib.reqTickers(short_contract)
-        short_current = short_tickers[0].marketPrice() * 100
+    if has_short:
+        short_current = tickers[1].marketPrice() * 100
         short_value = state.short_original_premium - short_current
 
     total_position_value = current_price + short_value
@@ -489,31 +657,33 @@ def check_leaps_stop_loss(ib: IB, ticker: str, state: PMCCState) -> bool:
 
     if stop_hit:
         print(f"STOP LOSS TRIGGERED: {reason}")
-        tg.send_stop_loss_alert(ticker, reason, leaps_loss)
-        liquidate_all_positions(ib, ticker, state)
+        # Fire the alert on an executor thread - liquidation shouldn't
+        # wait on the Telegram round-trip
+        asyncio.get_running_loop().run_in_executor(
+            None, tg.send_stop_loss_alert, ticker, reason, leaps_loss
+        )
+        await liquidate_all_positions(ib, ticker, state)
         return True
 
     return False
 
 
-def liquidate_all_positions(ib: IB, ticker: str, state: PMCCState) -> None:
+async def liquidate_all_positions(ib: IB, ticker: str, state: PMCCState) -> None:
     """Close all positions"""
     print("LIQUIDATING ALL POSITIONS")
 
     # Close short first
     if state.short_strike:
-        close_short_call(ib, ticker, state, "STOP LOSS - closing short")
+        await close_short_call(ib, ticker, state, "STOP LOSS - closing short")
 
     # Close LEAPS
     if state.leaps_strike and state.leaps_expiry and state.leaps_original_cost:
-        option = Option(ticker, state.leaps_expiry, state.leaps_strike, "C", "SMART")
-        contract = ib.qualifyContracts(option)[0]
+        contract = await get_leaps_contract(ib, ticker, state)
 
         order = MarketOrder("SELL", 1)
         trade = ib.placeOrder(contract, order)
 
-        while not trade.isDone():
-            ib.sleep(1)
+        await wait_for_fill(trade)
 
         exit_price = trade.orderStatus.avgFillPrice
         pnl = (exit_price * 100) - (state.leaps_original_cost or 0.0)
@@ -523,7 +693,7 @@ def liquidate_all_positions(ib: IB, ticker: str, state: PMCCState) -> None:
         print(f"LEAPS P&L: ${pnl:.2f}")
 
         # Log option trade with comprehensive data and Telegram notification
-        log_n_notify.log_option_trade(
+        await log_n_notify.log_option_trade(
             ib=ib,
             action="SELL_TO_CLOSE",
             option_contract=contract,
@@ -536,56 +706,58 @@ def liquidate_all_positions(ib: IB, ticker: str, state: PMCCState) -> None:
 
     state.stop_loss_triggered = True
     state.leaps_strike = None
+    state.leaps_con_id = None
     state.short_strike = None
+    state.short_con_id = None
 
     print(f"Final P&L: ${state.realized_pnl:.2f}")
     save_state(ticker, state)
 
 
-def manage_short_call(ib: IB, ticker: str, state: PMCCState) -> None:
+async def manage_short_call(ib: IB, ticker: str, state: PMCCState) -> None:
     """Daily management of short call position"""
     if not state.short_strike or not state.short_expiry:
         return
 
-    option = Option(ticker, state.short_expiry, state.short_strike, "C", "SMART")
-    contract = ib.qualifyContracts(option)[0]
-    tickers = ib.reqTickers(contract)
-    current_price = tickers[0].marketPrice() * 100
-    delta = get_option_delta(ib, contract)
+    contract = await get_short_contract(ib, ticker, state)
+    ticker_data = _short_quote.pop(contract.conId, None)
+    if ticker_data is None:
+        ticker_data = (await ib.reqTickersAsync(contract))[0]
+    current_price = ticker_data.marketPrice() * 100
+    delta = await get_option_delta(ib, contract)
 
     original_premium = state.short_original_premium or 0.0
-    current_loss = current_price - original_premium
-    current_profit = original_premium - current_price
-    loss_pct = (current_loss / original_premium) * 100 if original_premium else 0
-    profit_pct = (current_profit / original_premium) * 100 if original_premium else 0
+    # Signed P&L (positive = profit): one subtraction and one reciprocal
+    # instead of mirrored loss/profit values each with their own division
+    pnl = original_premium - current_price
+    pnl_pct = pnl * (100.0 / original_premium) if original_premium else 0.0
 
     print(f"Short call: ${state.short_strike}C Delta: {delta:.3f}")
-    print(f"P&L: ${-current_loss:.2f} ({profit_pct:.1f}%)")
+    print(f"P&L: ${pnl:.2f} ({pnl_pct:.1f}%)")
 
     # Check exit conditions
-    if current_loss >= MAX_LOSS_ABSOLUTE or loss_pct >= MAX_LOSS_PERCENTAGE:
-        print(f"Short call loss limit hit: ${current_loss:.2f}")
-        close_short_call(ib, ticker, state, "Stop loss on short")
+    if -pnl >= MAX_LOSS_ABSOLUTE or -pnl_pct >= MAX_LOSS_PERCENTAGE:
+        print(f"Short call loss limit hit: ${-pnl:.2f}")
+        await close_short_call(ib, ticker, state, "Stop loss on short")
 
-    elif profit_pct >= PROFIT_TAKE_PERCENTAGE:
-        print(f"Profit target hit: {profit_pct:.1f}%")
-        close_short_call(ib, ticker, state, "Profit target reached")
+    elif pnl_pct >= PROFIT_TAKE_PERCENTAGE:
+        print(f"Profit target hit: {pnl_pct:.1f}%")
+        await close_short_call(ib, ticker, state, "Profit target reached")
 
     elif delta >= ROLL_TRIGGER_DELTA:
         print(f"Delta trigger hit: {delta:.3f}")
-        roll_short_call(ib, ticker, state)
+        await roll_short_call(ib, ticker, state)
 
 
-def display_position_status(ib: IB, ticker: str, state: PMCCState) -> None:
+async def display_position_status(ib: IB, ticker: str, state: PMCCState) -> None:
     """Display current position status"""
     print("\n" + "=" * 60)
     print(f"PMCC POSITION STATUS - {ticker}")
     print("=" * 60)
 
     if state.leaps_strike and state.leaps_expiry:
-        option = Option(ticker, state.leaps_expiry, state.leaps_strike, "C", "SMART")
-        contract = ib.qualifyContracts(option)[0]
-        tickers = ib.reqTickers(contract)
+        contract = await get_leaps_contract(ib, ticker, state)
+        tickers = await ib.reqTickersAsync(contract)
         current_value = tickers[0].marketPrice() * 100
 
         original_cost = state.leaps_original_cost or 0.0
@@ -641,62 +813,66 @@ def is_market_open(ib: IB) -> bool:
     return market_open <= now_eastern <= market_close
 
 
-def run_daily(ib: IB, ticker: str) -> None:
+async def run_daily(ib: IB, ticker: str) -> None:
     """Run daily PMCC management"""
     print(f"=== Daily PMCC Management for {ticker} ===")
 
     state = load_state(ticker)
 
-    # Check if market is open
-    if not is_market_open(ib):
-        print("Market is closed - placing limit order and exiting")
-
-        # Only place order if we don't have LEAPS yet
-        if not state.leaps_strike and not state.stop_loss_triggered:
-            print("No LEAPS position - placing limit order for market open")
-            if buy_leaps(ib, ticker, state, use_limit=True):
-                print("Limit order placed successfully")
+    try:
+        # Check if market is open
+        if not is_market_open(ib):
+            print("Market is closed - placing limit order and exiting")
+
+            # Only place order if we don't have LEAPS yet
+            if not state.leaps_strike and not state.stop_loss_triggered:
+                print("No LEAPS position - placing limit order for market open")
+                if await buy_leaps(ib, ticker, state, use_limit=True):
+                    print("Limit order placed successfully")
+                else:
+                    print("Failed to place limit order")
             else:
-                print("Failed to place limit order")
-        else:
-            print("Already have LEAPS position - no action needed")
-
-        print("Exiting as market is closed")
-        return
+                print("Already have LEAPS position - no action needed")
 
-    # Check stop loss first
-    if check_leaps_stop_loss(ib, ticker, state):
-        print("Stop loss triggered - strategy halted")
-        return
+            print("Exiting as market is closed")
+            return
 
-    # Setup LEAPS if needed
-    if not state.leaps_strike and not state.stop_loss_triggered:
-        print("No LEAPS position - initiating setup")
-        if not buy_leaps(ib, ticker, state):
-            print("Failed to buy LEAPS")
+        # Check stop loss first
+        if await check_leaps_stop_loss(ib, ticker, state):
+            print("Stop loss triggered - strategy halted")
             return
 
-    # Manage short call
-    if state.short_strike:
-        manage_short_call(ib, ticker, state)
-    elif state.leaps_strike and not state.stop_loss_triggered:
-        print("No short call - selling new one")
-        sell_short_call(ib, ticker, state)
+        # Setup LEAPS if needed
+        if not state.leaps_strike and not state.stop_loss_triggered:
+            print("No LEAPS position - initiating setup")
+            if not await buy_leaps(ib, ticker, state):
+                print("Failed to buy LEAPS")
+                return
+
+        # Manage short call
+        if state.short_strike:
+            await manage_short_call(ib, ticker, state)
+        elif state.leaps_strike and not state.stop_loss_triggered:
+            print("No short call - selling new one")
+            await sell_short_call(ib, ticker, state)
 
-    display_position_status(ib, ticker, state)
+        await display_position_status(ib, ticker, state)
+    finally:
+        # One disk write per run, whatever path we took above
+        flush_state(ticker, state)
 
 
-def main():
+async def main():
     """Main entry point"""
     ib = IB()
 
     print(f"Connecting to IB on port {PORT}...")
-    ib.connect("127.0.0.1", PORT, clientId=CLIENT_ID)
+    await ib.connectAsync("127.0.0.1", PORT, clientId=CLIENT_ID)
     print("Connected")
 
     init_csv(TICKER)
     log_n_notify.init_option_trades_csv(TICKER)
-    run_daily(ib, TICKER)
+    await run_daily(ib, TICKER)
 
     ib.disconnect()
     print("Disconnected from IB")
@@ -704,4 +880,4 @@ def main():
 
 
 if __name__ == "__main__":
-    sys.exit(main())
+    sys.exit(asyncio.run(main()))
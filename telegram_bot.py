@@ -3,95 +3,346 @@
 Telegram bot for sending trading notifications
 """
 
+import asyncio
+import atexit
+import functools
 import json
 import logging
+import os
+import random
+import sys
+import threading
+import time
 from pathlib import Path
 
-import requests
+import aiohttp
+import orjson
 
-with Path("telegram_config.json").open("r") as f:
-    CONFIG = json.load(f)
+
+@functools.lru_cache(maxsize=1)
+def _config() -> dict:
+    """Bot config, read once on first use; env vars stand in for the file"""
+    try:
+        return json.loads(Path("telegram_config.json").read_text())
+    except FileNotFoundError:
+        token = os.environ.get("TELEGRAM_BOT_TOKEN")
+        chat_id = os.environ.get("TELEGRAM_CHAT_ID")
+        if token and chat_id:
+            return {"bot_token": token, "chat_id": chat_id}
+        return {}
+
+
+@functools.lru_cache(maxsize=1)
+def _send_url() -> str:
+    """sendMessage endpoint, built once - the token never changes in a run"""
+    return f"https://api.telegram.org/bot{_config()['bot_token']}/sendMessage"
+
+
+# Alerts run on a private background event loop, so sync callers can
+# fire several concurrently without blocking the strategy loop, and the
+# pooled keep-alive connection still skips per-alert TLS handshakes
+_loop: asyncio.AbstractEventLoop | None = None
+_session: aiohttp.ClientSession | None = None
+
+# Pending alerts, drained by a worker coroutine on the background loop;
+# producers enqueue and return without waiting on the network
+QUEUE_MAX = 1000
+_queue: asyncio.Queue | None = None
+
+# Alerts arriving within this window are folded into one sendMessage,
+# capped at Telegram's message size limit
+COALESCE_WINDOW = 0.2
+MESSAGE_CHAR_BUDGET = 4096
+_SEP = "\n\n━━━\n\n"
+
+# Repeats of an identical alert inside this window are dropped before
+# they ever reach the queue - error storms cost zero HTTP calls
+DEDUP_TTL = 30.0
+_recent: dict[int, float] = {}
+
+_JSON_HEADERS = {"Content-Type": "application/json"}
+
+# Shared template pieces, built once instead of per alert
+_BORDER = "━" * 18
+_STOP_HEADER = "🚨🚨🚨 STOP LOSS TRIGGERED 🚨🚨🚨"
+
+# Transient network failures get this many tries before the alert is
+# declared lost
+RETRY_ATTEMPTS = 3
+
+
+async def _send_batch(parts: list[str], mode: str | None):
+    # A poisoned batch must not kill the worker - log it and let the
+    # following alerts go out
+    try:
+        await send_message_async(_SEP.join(parts), mode)
+    except Exception as e:
+        logging.error("Telegram worker send failed: %s", e)
+
+
+async def _worker():
+    while True:
+        item = await _queue.get()
+        await asyncio.sleep(COALESCE_WINDOW)
+        items = [item]
+        while not _queue.empty():
+            items.append(_queue.get_nowait())
+
+        # Fold runs of same-parse-mode alerts under the char budget into
+        # one POST each
+        parts, mode = [items[0][0]], items[0][1]
+        length = len(parts[0])
+        for message, parse_mode in items[1:]:
+            fits = length + len(_SEP) + len(message) <= MESSAGE_CHAR_BUDGET
+            if parse_mode == mode and fits:
+                parts.append(message)
+                length += len(_SEP) + len(message)
+            else:
+                await _send_batch(parts, mode)
+                parts, mode, length = [message], parse_mode, len(message)
+        await _send_batch(parts, mode)
+
+        for _ in items:
+            _queue.task_done()
+
+        # Prune stale dedup entries while we're awake anyway
+        cutoff = time.monotonic() - DEDUP_TTL
+        for h in [h for h, ts in _recent.items() if ts < cutoff]:
+            del _recent[h]
+
+
+def _enqueue(item: tuple[str, str]):
+    # Runs on the loop thread; drop the oldest alert when full so the
+    # freshest ones survive
+    if _queue.full():
+        _queue.get_nowait()
+        _queue.task_done()  # the dropped item must not wedge _queue.join()
+    _queue.put_nowait(item)
+
+
+async def _drain():
+    await _queue.join()
+    _worker_task.cancel()
+    try:
+        await _worker_task
+    except asyncio.CancelledError:
+        pass
 
 
-def send_message(message: str, parse_mode: str = "Markdown") -> bool:
+def _flush():
+    """Drain queued alerts, then shut the background loop down cleanly"""
+    if _loop is None:
+        return
+    try:
+        asyncio.run_coroutine_threadsafe(_drain(), _loop).result(timeout=5)
+    except TimeoutError:
+        pass
+    _loop.call_soon_threadsafe(_loop.stop)
+
+
+def _start_worker():
+    global _worker_task
+    _worker_task = _loop.create_task(_worker())
+
+
+def _get_loop() -> asyncio.AbstractEventLoop:
+    global _loop, _queue
+    if _loop is None:
+        _loop = asyncio.new_event_loop()
+        _queue = asyncio.Queue(maxsize=QUEUE_MAX)
+        threading.Thread(target=_loop.run_forever, daemon=True).start()
+        _loop.call_soon_threadsafe(_start_worker)
+        atexit.register(_flush)
+    return _loop
+
+
+async def _get_session() -> aiohttp.ClientSession:
+    global _session
+    if _session is None:
+        _session = aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=8, keepalive_timeout=75),
+            timeout=aiohttp.ClientTimeout(total=10),
+        )
+    return _session
+
+
+async def send_message_async(message: str, parse_mode: str | None = None) -> bool:
     """Send message via Telegram"""
-    if not CONFIG:
+    cfg = _config()
+    if not cfg:
         print(f"[Telegram Disabled] {message}")
         return False
 
-    url = f"https://api.telegram.org/bot{CONFIG['bot_token']}/sendMessage"
-
-    payload = {"chat_id": CONFIG["chat_id"], "text": message}
+    payload = {"chat_id": cfg["chat_id"], "text": message}
     if parse_mode:
         payload["parse_mode"] = parse_mode
+    # orjson encodes straight to bytes, skipping aiohttp's stdlib
+    # json.dumps plus the str->bytes copy
+    body = orjson.dumps(payload)
 
-    try:
-        response = requests.post(url, json=payload, timeout=10)
-        response.raise_for_status()
+    session = await _get_session()
+    for attempt in range(RETRY_ATTEMPTS):
+        try:
+            async with session.post(
+                _send_url(), data=body, headers=_JSON_HEADERS
+            ) as response:
+                if response.status == 200:
+                    return True
+                # Rate limited: honor Telegram's retry_after instead of
+                # losing the alert
+                if response.status == 429:
+                    data = await response.json()
+                    await asyncio.sleep(data["parameters"]["retry_after"])
+                    continue
+                logging.error("Telegram send failed: HTTP %s", response.status)
+                return False
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            if attempt == RETRY_ATTEMPTS - 1:
+                logging.error("Failed to send Telegram message: %s", e)
+                return False
+        # Transient network failure: geometric backoff with jitter so a
+        # DNS blip or dropped socket doesn't cost the alert
+        await asyncio.sleep(min(2**attempt, 4) + random.random() * 0.25)
+    return False
+
+
+def _split_oversized(message: str) -> list[str]:
+    """Split a too-long message at newlines into sendable chunks"""
+    chunks: list[str] = []
+    buf: list[str] = []
+    size = 0
+    for line in message.split("\n"):
+        # A single line over the budget can't be split at newlines -
+        # hard-slice it so no chunk ever exceeds the limit
+        while len(line) > MESSAGE_CHAR_BUDGET:
+            if buf:
+                chunks.append("\n".join(buf))
+                buf, size = [], 0
+            chunks.append(line[:MESSAGE_CHAR_BUDGET])
+            line = line[MESSAGE_CHAR_BUDGET:]
+        if buf and size + 1 + len(line) > MESSAGE_CHAR_BUDGET:
+            chunks.append("\n".join(buf))
+            buf, size = [], 0
+        size += 1 + len(line) if buf else len(line)
+        buf.append(line)
+    chunks.append("\n".join(buf))
+    return chunks
+
+
+def send_message(
+    message: str, parse_mode: str | None = None, urgent: bool = False
+) -> bool:
+    """Queue the alert for the background worker and return immediately
+
+    urgent alerts skip the queue and its coalescing window entirely.
+    Identical alerts repeated within DEDUP_TTL seconds are dropped.
+    """
+    # Telegram rejects text over 4096 chars with a 400 - split locally
+    # instead of burning the round-trip and losing the alert
+    if len(message) > MESSAGE_CHAR_BUDGET:
+        # List first so every chunk is sent even if one fails
+        sent = [send_message(c, parse_mode, urgent) for c in _split_oversized(message)]
+        return all(sent)
+
+    now = time.monotonic()
+    h = hash((parse_mode, message))
+    if now - _recent.get(h, -DEDUP_TTL) < DEDUP_TTL:
         return True
-    except requests.exceptions.RequestException as e:
-        logging.error(f"Failed to send Telegram message: {e}")
-        return False
+    _recent[h] = now
+
+    loop = _get_loop()
+    if urgent:
+        asyncio.run_coroutine_threadsafe(send_message_async(message, parse_mode), loop)
+        return True
+    loop.call_soon_threadsafe(_enqueue, (message, parse_mode))
+    return True
+
+
+def send_many(messages: list[str]) -> bool:
+    """Batch several alerts into as few sendMessage calls as possible
+
+    Related alerts produced together (trade alert + position update)
+    fold into one POST per MESSAGE_CHAR_BUDGET-sized chunk instead of
+    one HTTP round-trip each.
+    """
+    ok = True
+    buf: list[str] = []
+    size = 0
+    for message in messages:
+        if buf and size + len(_SEP) + len(message) > MESSAGE_CHAR_BUDGET:
+            ok = send_message(_SEP.join(buf)) and ok
+            buf, size = [], 0
+        size += len(_SEP) + len(message) if buf else len(message)
+        buf.append(message)
+    if buf:
+        ok = send_message(_SEP.join(buf)) and ok
+    return ok
 
 
 def send_trade_alert(
     action: str, ticker: str, strike: float, expiry: str, price: float, **kwargs
 ):
     """Send formatted trade alert"""
-    # Use emojis and plain text
-    message = f"🔔 Trade Alert - {ticker} 📊\n"
-    message += "━━━━━━━━━━━━━━━━━━\n"
-    message += f"📌 Action: {action}\n"
-    message += f"💵 Strike: ${strike}\n"
-    message += f"📅 Expiry: {expiry}\n"
-    message += f"💰 Price: ${price:.2f}\n"
-
-    for key, value in kwargs.items():
-        value = f"{value:.2f}"
-        message += f"📐 {key}: {value}\n"
-
-    message += "━━━━━━━━━━━━━━━━━━"
+    # Use emojis and plain text; one join instead of a new str per +=
+    parts = [
+        f"🔔 Trade Alert - {ticker} 📊",
+        _BORDER,
+        f"📌 Action: {action}",
+        f"💵 Strike: ${strike}",
+        f"📅 Expiry: {expiry}",
+        f"💰 Price: ${price:.2f}",
+    ]
+    parts.extend(f"📐 {key}: {value:.2f}" for key, value in kwargs.items())
+    parts.append(_BORDER)
 
-    # Send without markdown parsing
-    return send_message(message, parse_mode=None)
+    return send_message("\n".join(parts))
 
 
 def send_stop_loss_alert(ticker: str, reason: str, loss_amount: float):
     """Send urgent stop loss alert"""
-    message = "🚨🚨🚨 STOP LOSS TRIGGERED 🚨🚨🚨\n"
-    message += "━━━━━━━━━━━━━━━━━━\n"
-    message += f"📊 Ticker: {ticker}\n"
-    message += f"⚠️ Reason: {reason}\n"
-    message += f"💔 Loss Amount: ${loss_amount:.2f}\n"
-    message += "━━━━━━━━━━━━━━━━━━\n"
-    message += "🔴 All positions being liquidated"
+    message = "\n".join(
+        (
+            _STOP_HEADER,
+            _BORDER,
+            f"📊 Ticker: {ticker}",
+            f"⚠️ Reason: {reason}",
+            f"💔 Loss Amount: ${loss_amount:.2f}",
+            _BORDER,
+            "🔴 All positions being liquidated",
+        )
+    )
 
-    return send_message(message, parse_mode=None)
+    return send_message(message, urgent=True)
 
 
 def send_position_update(
     ticker: str, leaps_pnl: float, short_pnl: float, total_collected: float
 ):
     """Send position status update"""
-    message = f"📊 *Position Update - {ticker}*\n\n"
-    message += f"*LEAPS P&L:* ${leaps_pnl:.2f}\n"
-    message += f"*Short Call P&L:* ${short_pnl:.2f}\n"
-    message += f"*Total Premium:* ${total_collected:.2f}\n"
-    message += f"*Net P&L:* ${leaps_pnl + short_pnl:.2f}"
+    # Plain text: legacy Markdown turned a ticker with "_" into a 400
+    message = "\n".join(
+        (
+            f"📊 Position Update - {ticker}\n",
+            f"LEAPS P&L: ${leaps_pnl:.2f}",
+            f"Short Call P&L: ${short_pnl:.2f}",
+            f"Total Premium: ${total_collected:.2f}",
+            f"Net P&L: ${leaps_pnl + short_pnl:.2f}",
+        )
+    )
 
     return send_message(message)
 
 
 def send_error(error_msg: str):
     """Send error notification"""
-    message = f"❌ *Error*\n\n{error_msg}"
+    message = f"❌ Error\n\n{error_msg}"
     return send_message(message)
 
 
-# Test function
+# Smoke test; stays offline unless explicitly asked to go live
 if __name__ == "__main__":
-    if CONFIG:
-        success = send_message("✅ Telegram bot connected!")
+    if "--live" in sys.argv and _config():
+        success = send_many(["✅ Telegram bot connected!", "📦 Batch send works"])
         print("Test message sent" if success else "Failed to send")
     else:
-        print("Telegram not configured - set up telegram_config.json")
+        print("Module import OK; pass --live to send a test message")